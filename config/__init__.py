@@ -1,4 +1,16 @@
 """Configuration package."""
-from .settings import settings, get_project_root, get_data_dir, get_logs_dir
+from .settings import get_settings, get_project_root, get_data_dir, get_logs_dir
 
-__all__ = ["settings", "get_project_root", "get_data_dir", "get_logs_dir"]
\ No newline at end of file
+# Importing from .settings binds the submodule as config.settings; drop that
+# binding so the legacy `from config import settings` reaches __getattr__
+globals().pop("settings", None)
+
+
+def __getattr__(name: str):
+    """Resolve the legacy global settings instance on first access."""
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["settings", "get_settings", "get_project_root", "get_data_dir", "get_logs_dir"]
\ No newline at end of file
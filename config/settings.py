@@ -1,10 +1,23 @@
 """Configuration management for Oura Sync service."""
 import os
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# All available OAuth scopes for Oura API
+OAUTH_SCOPES: tuple[str, ...] = (
+    "email",
+    "personal",
+    "daily",
+    "heartrate",
+    "workout",
+    "tag",
+    "session",
+    "spo2",
+)
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -39,7 +52,7 @@ class Settings(BaseSettings):
         extra="ignore"
     )
     
-    @property
+    @cached_property
     def database_url_constructed(self) -> str:
         """Construct database URL from components if not provided directly."""
         if self.database_url:
@@ -50,38 +63,52 @@ class Settings(BaseSettings):
         )
     
     @property
-    def oauth_scopes(self) -> list[str]:
+    def oauth_scopes(self) -> tuple[str, ...]:
         """Return all available OAuth scopes for Oura API."""
-        return [
-            "email",
-            "personal",
-            "daily",
-            "heartrate",
-            "workout",
-            "tag",
-            "session",
-            "spo2"
-        ]
+        return OAUTH_SCOPES
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the application settings, parsing the environment only once.
+
+    Call get_settings.cache_clear() to force a re-read (e.g. in tests).
+    """
+    return Settings()
+
+
+def __getattr__(name: str):
+    """
+    Resolve the legacy global settings instance on first access.
+
+    Deferring construction means importing this module doesn't read the
+    environment until something actually needs a setting.
+    """
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-# Global settings instance
-settings = Settings()
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 
 def get_project_root() -> Path:
     """Get the project root directory."""
-    return Path(__file__).parent.parent
+    return _PROJECT_ROOT
 
 
+@lru_cache(maxsize=1)
 def get_data_dir() -> Path:
-    """Get the data directory for storing files."""
+    """Get the data directory for storing files (created on first call)."""
     data_dir = get_project_root() / "data"
     data_dir.mkdir(exist_ok=True)
     return data_dir
 
 
+@lru_cache(maxsize=1)
 def get_logs_dir() -> Path:
-    """Get the logs directory."""
+    """Get the logs directory (created on first call)."""
     logs_dir = get_project_root() / "logs"
     logs_dir.mkdir(exist_ok=True)
     return logs_dir
\ No newline at end of file
@@ -1,4 +1,5 @@
 """OAuth token storage model."""
+import time
 from datetime import datetime
 from typing import Optional
 
@@ -33,7 +34,8 @@ class OAuthToken(Base, TimestampMixin):
         """Check if access token is expired."""
         if not self.expires_at:
             return False
-        return datetime.now(self.expires_at.tzinfo) >= self.expires_at
+        # Epoch comparison avoids building a tz-aware "now" datetime per check
+        return time.time() >= self.expires_at.timestamp()
     
     def __repr__(self) -> str:
         return f"<OAuthToken(user_id='{self.user_id}', expires_at='{self.expires_at}')>"
\ No newline at end of file
@@ -1,17 +1,21 @@
 """daily_activity model based on Oura API schema."""
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Text, Integer, Date, Float, DateTime
+from sqlalchemy import String, Text, Integer, Date, Float, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column
-from .base import Base, OuraBaseMixin
+from .base import Base, JSONType, OuraBaseMixin
 
 class DailyActivity(Base, OuraBaseMixin):
     __tablename__ = "daily_activity"
+    __table_args__ = (
+        # Queries filter by user and day together; covers score for index-only scans
+        Index("ix_daily_activity_user_day", "user_id", "day", postgresql_include=["score"]),
+    )
     id: Mapped[str] = mapped_column(String(255), primary_key=True)
-    user_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(255), nullable=False)
 
     # Core fields
-    day: Mapped[datetime] = mapped_column(Date, nullable=False, index=True)
+    day: Mapped[datetime] = mapped_column(Date, nullable=False)
     score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
@@ -51,4 +55,7 @@ class DailyActivity(Base, OuraBaseMixin):
     training_volume: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
     # Raw JSON data for extensibility (stores met.items array and other nested data)
-    raw_data: Mapped[str] = mapped_column(Text, nullable=True)
+    raw_data: Mapped[Optional[dict]] = mapped_column(JSONType, nullable=True)
+
+    # Hash of the API payload, used to skip unchanged records on re-sync
+    data_hash: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
@@ -1,17 +1,21 @@
 """daily_sleep model based on Oura API schema."""
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Text, Integer, DateTime, Date
+from sqlalchemy import String, Integer, DateTime, Date, Index
 from sqlalchemy.orm import Mapped, mapped_column
-from .base import Base, OuraBaseMixin
+from .base import Base, JSONType, OuraBaseMixin
 
 class DailySleep(Base, OuraBaseMixin):
     __tablename__ = "daily_sleep"
+    __table_args__ = (
+        # Queries filter by user and day together; covers score for index-only scans
+        Index("ix_daily_sleep_user_day", "user_id", "day", postgresql_include=["score"]),
+    )
     id: Mapped[str] = mapped_column(String(255), primary_key=True)
-    user_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(255), nullable=False)
 
     # Core fields
-    day: Mapped[datetime] = mapped_column(Date, nullable=False, index=True)
+    day: Mapped[datetime] = mapped_column(Date, nullable=False)
     score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
@@ -25,4 +29,7 @@ class DailySleep(Base, OuraBaseMixin):
     total_sleep: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
     # Raw JSON data for extensibility
-    raw_data: Mapped[str] = mapped_column(Text, nullable=True)
+    raw_data: Mapped[Optional[dict]] = mapped_column(JSONType, nullable=True)
+
+    # Hash of the API payload, used to skip unchanged records on re-sync
+    data_hash: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
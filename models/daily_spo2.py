@@ -1,19 +1,26 @@
 """daily_spo2 model based on Oura API schema."""
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Text, Integer, Date, Float
+from sqlalchemy import String, Integer, Date, Float, Index
 from sqlalchemy.orm import Mapped, mapped_column
-from .base import Base, OuraBaseMixin
+from .base import Base, JSONType, OuraBaseMixin
 
 class DailySpo2(Base, OuraBaseMixin):
     __tablename__ = "daily_spo2"
+    __table_args__ = (
+        # Queries filter by user and day together
+        Index("ix_daily_spo2_user_day", "user_id", "day"),
+    )
     id: Mapped[str] = mapped_column(String(255), primary_key=True)
-    user_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(255), nullable=False)
 
     # Core fields
-    day: Mapped[datetime] = mapped_column(Date, nullable=False, index=True)
+    day: Mapped[datetime] = mapped_column(Date, nullable=False)
     breathing_disturbance_index: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     spo2_percentage_average: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     # Raw JSON data for extensibility
-    raw_data: Mapped[str] = mapped_column(Text, nullable=True)
+    raw_data: Mapped[Optional[dict]] = mapped_column(JSONType, nullable=True)
+
+    # Hash of the API payload, used to skip unchanged records on re-sync
+    data_hash: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
@@ -1,10 +1,19 @@
-"""personal_info model stub - expand based on API schema."""
-from sqlalchemy import String, Text
+"""personal_info model based on Oura API schema."""
+from typing import Optional
+from sqlalchemy import String, Integer, Float
 from sqlalchemy.orm import Mapped, mapped_column
-from .base import Base, OuraBaseMixin
+from .base import Base, JSONType, OuraBaseMixin
 
 class PersonalInfo(Base, OuraBaseMixin):
     __tablename__ = "personal_info"
     id: Mapped[str] = mapped_column(String(255), primary_key=True)
     user_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
-    raw_data: Mapped[str] = mapped_column(Text, nullable=True)
+
+    # Core fields
+    age: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    weight: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    height: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    biological_sex: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    email: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+
+    raw_data: Mapped[Optional[dict]] = mapped_column(JSONType, nullable=True)
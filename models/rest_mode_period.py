@@ -1,10 +1,11 @@
 """rest_mode_period model stub - expand based on API schema."""
-from sqlalchemy import String, Text
+from typing import Optional
+from sqlalchemy import String
 from sqlalchemy.orm import Mapped, mapped_column
-from .base import Base, OuraBaseMixin
+from .base import Base, JSONType, OuraBaseMixin
 
 class RestModePeriod(Base, OuraBaseMixin):
     __tablename__ = "rest_mode_period"
     id: Mapped[str] = mapped_column(String(255), primary_key=True)
     user_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
-    raw_data: Mapped[str] = mapped_column(Text, nullable=True)
+    raw_data: Mapped[Optional[dict]] = mapped_column(JSONType, nullable=True)
@@ -40,6 +40,10 @@ def main():
         print("\nNext steps:")
         print("1. Run: python scripts/authenticate.py")
         print("2. Run: python scripts/sync_data.py\n")
+    except RuntimeError as e:
+        # Existing tables are missing columns; the message lists the fixes
+        print(f"\n✗ {e}")
+        return 1
     except Exception as e:
         print(f"\n✗ Failed to create tables: {e}")
         logger.exception("Database initialization error")
@@ -1,145 +1,218 @@
 #!/usr/bin/env python3
 """Script to sync Oura data to database."""
 import argparse
-import json
+import hashlib
+import logging
 import sys
-from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+import orjson
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from services.oura_client import OuraClient
-from models.auth import OAuthToken
-from models.personal_info import PersonalInfo
-from models.daily_activity import DailyActivity
-from models.daily_readiness import DailyReadiness
-from models.daily_sleep import DailySleep
-from models.daily_spo2 import DailySpo2
-from models.daily_stress import DailyStress
-from utils import logger, get_db
-from utils.mappers import MAPPERS
+# Settings, SQLAlchemy and the models are imported where they're used, so
+# --help doesn't pay for loading them. Handlers for this logger are set up
+# by utils.logger once main() imports the client.
+logger = logging.getLogger("oura_sync")
+
+if TYPE_CHECKING:
+    from services.oura_client import OuraClient
+
+# Data types synced when neither --all nor --types is given
+_DEFAULT_DATA_TYPES = ("daily_activity", "daily_sleep", "daily_readiness")
+
+# Column keys per model, filled in on first use
+_COLUMN_KEYS: dict[type, frozenset[str]] = {}
+
+# PersonalInfo columns not filled from the API field of the same name
+_PERSONAL_INFO_EXCLUDED = frozenset({"id", "user_id", "raw_data", "created_at", "updated_at"})
 
 
 def get_user_id() -> str:
     """Get the user ID from database."""
+    from sqlalchemy import select
+
+    from models.auth import OAuthToken
+    from utils import get_db
+
     with get_db() as db:
-        token = db.query(OAuthToken).first()
-        if not token:
-            print("No authentication found. Please run: python scripts/authenticate.py")
-            sys.exit(1)
-        return token.user_id
+        user_id = db.execute(select(OAuthToken.user_id).limit(1)).scalar_one_or_none()
+    if not user_id:
+        print("No authentication found. Please run: python scripts/authenticate.py")
+        sys.exit(1)
+    return user_id
 
 
-def sync_personal_info(client: OuraClient, user_id: str):
+def sync_personal_info(client: "OuraClient", user_id: str):
     """Sync personal information."""
+    from models.personal_info import PersonalInfo
+    from utils import get_db
+
     logger.info("Syncing personal info...")
     try:
         data = client.get_personal_info()
-        
+
+        # Only API fields that map onto a column
+        fields = (get_column_keys(PersonalInfo) - _PERSONAL_INFO_EXCLUDED) & data.keys()
+        values = {key: data[key] for key in fields}
+        values["id"] = data["id"]
+        values["user_id"] = user_id
+
         with get_db() as db:
-            existing = db.query(PersonalInfo).filter(PersonalInfo.id == data["id"]).first()
-            
-            if existing:
-                for key, value in data.items():
-                    if hasattr(existing, key):
-                        setattr(existing, key, value)
-                logger.info("Updated personal info")
+            if db.get_bind().dialect.name == "postgresql":
+                # Single INSERT ... ON CONFLICT DO UPDATE instead of SELECT + write
+                db.execute(personal_info_upsert(values, fields))
             else:
-                personal_info = PersonalInfo(
-                    id=data["id"],
-                    user_id=user_id,
-                    age=data.get("age"),
-                    weight=data.get("weight"),
-                    height=data.get("height"),
-                    biological_sex=data.get("biological_sex"),
-                    email=data.get("email")
-                )
-                db.add(personal_info)
-                logger.info("Created personal info record")
-        
+                db.merge(PersonalInfo(**values))
+        logger.info("Saved personal info")
+
         return True
     except Exception as e:
         logger.error(f"Failed to sync personal info: {e}")
         return False
 
 
-def sync_daily_data(client: OuraClient, user_id: str, start_date: str, end_date: str, data_types: list):
-    """Sync daily summary data."""
-    methods_map = {
-        "daily_activity": client.get_daily_activity,
-        "daily_sleep": client.get_daily_sleep,
-        "daily_readiness": client.get_daily_readiness,
-        "daily_spo2": client.get_daily_spo2,
-        "daily_stress": client.get_daily_stress,
-        "daily_resilience": client.get_daily_resilience,
-        "daily_cardiovascular_age": client.get_daily_cardiovascular_age,
-    }
+def personal_info_upsert(values: dict, fields: Iterable[str]):
+    """Build the PostgreSQL upsert of a personal info row, updating the given API fields."""
+    from sqlalchemy.dialects import postgresql
+
+    from models.personal_info import PersonalInfo
+
+    stmt = postgresql.insert(PersonalInfo).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=[PersonalInfo.id],
+        set_={
+            key: stmt.excluded[key]
+            for key in (*fields, "updated_at")
+        }
+    )
+
+
+def get_column_keys(model_class) -> frozenset[str]:
+    """Get the (cached) set of column keys for a model."""
+    keys = _COLUMN_KEYS.get(model_class)
+    if keys is None:
+        keys = frozenset(column.key for column in model_class.__table__.columns)
+        _COLUMN_KEYS[model_class] = keys
+    return keys
 
-    # Model map for querying existing records
-    model_map = {
-        "daily_activity": DailyActivity,
-        "daily_sleep": DailySleep,
-        "daily_readiness": DailyReadiness,
-        "daily_spo2": DailySpo2,
-        "daily_stress": DailyStress,
-    }
 
-    for data_type in data_types:
-        if data_type not in methods_map:
-            continue
+def hash_record(record_data: dict) -> str:
+    """Get a short, stable hash of an API record."""
+    payload = orjson.dumps(record_data, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
 
-        logger.info(f"Syncing {data_type}...")
-        try:
-            method = methods_map[data_type]
-            data_list = method(start_date, end_date)
 
-            logger.info(f"Retrieved {len(data_list)} {data_type} records")
+def write_output_file(path: Path, payload: bytes):
+    """Write bytes to a file, creating its directory only if it's missing."""
+    try:
+        path.write_bytes(payload)
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(payload)
+
+
+def fetch_daily_data(method, data_type: str, user_id: str, start_date: str, end_date: str, refresh_cache: bool = False) -> list[dict]:
+    """
+    Fetch daily data, serving days that can no longer change from the local cache.
+
+    Only the range after the leading run of cached days is requested from the API.
+    With refresh_cache, the whole range is fetched and its cached days rewritten.
+    """
+    from utils.cache import load_cached_days, store_days
+
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    if refresh_cache:
+        cached, fetch_start = [], start
+    else:
+        cached, fetch_start = load_cached_days(data_type, user_id, start, end)
+    if fetch_start > end:
+        logger.info(f"All {data_type} days served from cache")
+        return cached
+    if cached:
+        logger.info(f"{data_type}: {len(cached)} cached records, fetching from {fetch_start}")
 
-            # Save to database if mapper exists
-            if data_type in MAPPERS:
-                mapper = MAPPERS[data_type]
-                model_class = model_map[data_type]
+    fetched = method(fetch_start.isoformat(), end_date)
+    store_days(data_type, user_id, fetched, fetch_start, end)
+    return cached + fetched
 
-                with get_db() as db:
-                    saved_count = 0
-                    updated_count = 0
 
-                    for record_data in data_list:
-                        # Check if record already exists
-                        existing = db.query(model_class).filter(
-                            model_class.id == record_data["id"]
-                        ).first()
+def save_daily_data(data_type: str, data_list: list[dict], user_id: str):
+    """Save fetched daily data to the database."""
+    # Imported here so runs that don't save mapped types skip loading the models
+    from utils import bulk_upsert, get_db
+    from utils.mappers import DICT_MAPPERS, MODELS
 
-                        if existing:
-                            # Update existing record
-                            mapped_data = mapper(record_data, user_id)
-                            for key, value in mapped_data.__dict__.items():
-                                if not key.startswith("_"):
-                                    setattr(existing, key, value)
-                            updated_count += 1
-                        else:
-                            # Create new record
-                            new_record = mapper(record_data, user_id)
-                            db.add(new_record)
-                            saved_count += 1
+    # Save to database if mapper exists
+    if data_type not in DICT_MAPPERS:
+        return
 
-                    db.commit()
-                    logger.info(f"Saved {saved_count} new records, updated {updated_count} records to database")
+    mapper = DICT_MAPPERS[data_type]
+    rows = []
+    for record_data in data_list:
+        row = mapper(record_data, user_id)
+        row["data_hash"] = hash_record(record_data)
+        rows.append(row)
 
-            # Save to JSON file for reference
-            output_dir = Path(__file__).parent.parent / "data" / data_type
-            output_dir.mkdir(parents=True, exist_ok=True)
+    if rows:
+        with get_db() as db:
+            bulk_upsert(db, MODELS[data_type], rows)
+        logger.info(f"Upserted {len(rows)} records to database")
 
-            output_file = output_dir / f"{start_date}_to_{end_date}.json"
-            with open(output_file, "w") as f:
-                json.dump(data_list, f, indent=2, default=str)
 
-            logger.info(f"Saved to {output_file}")
+def save_daily_json(data_type: str, data_list: list[dict], start_date: str, end_date: str, pretty: bool = False) -> Path:
+    """Save fetched daily data to a JSON file for reference (compact unless pretty)."""
+    output_dir = Path(__file__).parent.parent / "data" / data_type
+    output_file = output_dir / f"{start_date}_to_{end_date}.json"
+    option = orjson.OPT_NAIVE_UTC
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    write_output_file(output_file, orjson.dumps(data_list, option=option))
+    return output_file
 
-        except Exception as e:
-            logger.error(f"Failed to sync {data_type}: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+
+def sync_daily_data(client: "OuraClient", user_id: str, start_date: str, end_date: str, data_types: list, pretty_json: bool = False, refresh_cache: bool = False):
+    """Sync daily summary data."""
+    methods_map = {
+        data_type: getattr(client, client.DAILY_METHODS[data_type])
+        for data_type in data_types if data_type in client.DAILY_METHODS
+    }
+    if not methods_map:
+        return
+
+    # API calls are network-bound, so fetch all data types concurrently.
+    # Results are saved to the database on this thread as they arrive, while
+    # the JSON copies are written by the pool in the background.
+    with ThreadPoolExecutor(max_workers=len(methods_map)) as executor:
+        fetches = {}
+        for data_type, method in methods_map.items():
+            logger.info(f"Syncing {data_type}...")
+            future = executor.submit(fetch_daily_data, method, data_type, user_id, start_date, end_date, refresh_cache)
+            fetches[future] = data_type
+
+        writes = {}
+        for future in as_completed(fetches):
+            data_type = fetches[future]
+            try:
+                data_list = future.result()
+                logger.info(f"Retrieved {len(data_list)} {data_type} records")
+                future = executor.submit(save_daily_json, data_type, data_list, start_date, end_date, pretty_json)
+                writes[future] = data_type
+                save_daily_data(data_type, data_list, user_id)
+            except Exception as e:
+                logger.error(f"Failed to sync {data_type}: {e}")
+                import traceback
+                logger.error(traceback.format_exc())
+
+        for future in as_completed(writes):
+            data_type = writes[future]
+            try:
+                logger.info(f"Saved to {future.result()}")
+            except Exception as e:
+                logger.error(f"Failed to save {data_type} JSON file: {e}")
 
 
 def main():
@@ -151,12 +224,24 @@ def main():
     parser.add_argument("--types", help="Comma-separated data types to sync")
     parser.add_argument("--all", action="store_true", help="Sync all data types")
     parser.add_argument("--sync-personal-info", action="store_true", help="Sync personal info (only needed once)")
+    parser.add_argument("--pretty-json", action="store_true", help="Indent the JSON files saved to ./data/")
+    parser.add_argument("--refresh-cache", action="store_true", help="Re-fetch cached days and rewrite the cache")
     
     args = parser.parse_args()
-    
+
+    from services.oura_client import OuraClient
+    from utils.database import check_schema
+
     print("\n" + "="*80)
     print("OURA DATA SYNC")
     print("="*80 + "\n")
+
+    # Fail before fetching anything if the tables predate the current models
+    try:
+        check_schema()
+    except RuntimeError as e:
+        print(f"✗ {e}\n")
+        return 1
     
     # Get user ID
     user_id = get_user_id()
@@ -170,11 +255,11 @@ def main():
         end_date = date.today()
         start_date = end_date - timedelta(days=90)
     else:
-        end_date = datetime.strptime(args.end_date, "%Y-%m-%d").date() if args.end_date else date.today()
-        start_date = datetime.strptime(args.start_date, "%Y-%m-%d").date() if args.start_date else end_date - timedelta(days=7)
+        end_date = date.fromisoformat(args.end_date) if args.end_date else date.today()
+        start_date = date.fromisoformat(args.start_date) if args.start_date else end_date - timedelta(days=7)
     
-    start_date_str = start_date.strftime("%Y-%m-%d")
-    end_date_str = end_date.strftime("%Y-%m-%d")
+    start_date_str = start_date.isoformat()
+    end_date_str = end_date.isoformat()
     
     logger.info(f"Date range: {start_date_str} to {end_date_str}")
 
@@ -185,21 +270,17 @@ def main():
     
     # Determine data types to sync
     if args.all:
-        data_types = [
-            "daily_activity", "daily_sleep", "daily_readiness",
-            "daily_spo2", "daily_stress", "daily_resilience",
-            "daily_cardiovascular_age"
-        ]
+        data_types = list(OuraClient.DAILY_METHODS)
     elif args.types:
         data_types = [t.strip() for t in args.types.split(",")]
     else:
         # Default: sync main daily summaries
-        data_types = ["daily_activity", "daily_sleep", "daily_readiness"]
+        data_types = list(_DEFAULT_DATA_TYPES)
     
     logger.info(f"Syncing data types: {', '.join(data_types)}")
     
     # Sync data
-    sync_daily_data(client, user_id, start_date_str, end_date_str, data_types)
+    sync_daily_data(client, user_id, start_date_str, end_date_str, data_types, args.pretty_json, args.refresh_cache)
     
     print("\n" + "="*80)
     print("✓ SYNC COMPLETE")
@@ -1,26 +1,85 @@
 """OAuth2 authentication service for Oura API."""
 import os
-import secrets
+import threading
+import time
 import webbrowser
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from requests_oauthlib import OAuth2Session
 
-from config import settings
+from config import get_settings
 from models.auth import OAuthToken
 from utils import logger
 from utils.database import get_db
 
 # Allow OAuth over HTTP for local development (localhost redirect URIs)
 # This is safe because the redirect is to localhost only
-if settings.oura_redirect_uri.startswith('http://localhost') or settings.oura_redirect_uri.startswith('http://127.0.0.1'):
+if get_settings().oura_redirect_uri.startswith(('http://localhost', 'http://127.0.0.1')):
     os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 
 # Disable strict scope checking - Oura returns scopes with 'extapi:' prefix
 # but we request them without prefix (e.g., 'daily' vs 'extapi:daily')
 os.environ['OAUTHLIB_RELAX_TOKEN_SCOPE'] = '1'
 
+# Maximum time (seconds) a token is served from the in-process cache
+TOKEN_CACHE_TTL = 300
+
+# In-process token cache: user_id -> (token, monotonic deadline)
+_token_cache: dict[str, tuple[OAuthToken, float]] = {}
+_token_cache_lock = threading.Lock()
+
+# Per-user locks serializing token refreshes: user_id -> lock
+_refresh_locks: dict[str, threading.Lock] = {}
+_refresh_locks_guard = threading.Lock()
+
+
+def _refresh_lock_for(user_id: str) -> threading.Lock:
+    """Return the lock that serializes token refreshes for a user."""
+    with _refresh_locks_guard:
+        return _refresh_locks.setdefault(user_id, threading.Lock())
+
+
+def _seconds_until(expires_at: datetime) -> int:
+    """Seconds until a stored expiry, treating naive datetimes as UTC."""
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return int((expires_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _session_token(token_data: dict, refresh_token: str) -> dict:
+    """
+    Build an OAuth2Session token dict from a token response.
+
+    expires_at is included so the session (and callers reading session.token)
+    know when the access token runs out.
+    """
+    expires_in = token_data.get("expires_in", 86400)
+    return {
+        "access_token": token_data["access_token"],
+        "refresh_token": token_data.get("refresh_token", refresh_token),
+        "token_type": token_data.get("token_type", "Bearer"),
+        "expires_in": expires_in,
+        "expires_at": time.time() + expires_in,
+    }
+
+
+def _cache_token(user_id: str, token: OAuthToken):
+    """Cache a (detached) token until the TTL passes or shortly before it expires."""
+    ttl = TOKEN_CACHE_TTL
+    if token.expires_at:
+        ttl = min(ttl, token.expires_at.timestamp() - time.time() - 60)
+    if ttl <= 0:
+        return
+    with _token_cache_lock:
+        _token_cache[user_id] = (token, time.monotonic() + ttl)
+
+
+def _invalidate_token(user_id: str):
+    """Drop a user's token from the in-process cache."""
+    with _token_cache_lock:
+        _token_cache.pop(user_id, None)
+
 
 class OuraOAuth:
     """Handle OAuth2 authentication flow with Oura API."""
@@ -31,6 +90,7 @@ class OuraOAuth:
     REVOKE_URL = "https://api.ouraring.com/oauth/revoke"
 
     def __init__(self):
+        settings = get_settings()
         self.client_id = settings.oura_client_id
         self.client_secret = settings.oura_client_secret
         self.redirect_uri = settings.oura_redirect_uri
@@ -181,6 +241,60 @@ class OuraOAuth:
             logger.error(f"Token refresh failed: {str(e)}")
             raise Exception(f"Failed to refresh token: {str(e)}")
     
+    def refresh_user_token(self, user_id: str, refresh_token: str) -> dict:
+        """
+        Refresh and save a user's token, refreshing at most once per rotation.
+
+        Oura refresh tokens are single-use, so refreshes for a user are
+        serialized. Under the lock the stored token is re-read: if its refresh
+        token no longer matches the one passed in, another caller has already
+        rotated it and the stored token is returned instead of refreshing again.
+
+        Args:
+            user_id: User identifier
+            refresh_token: Refresh token the caller holds
+
+        Returns:
+            New token response dictionary
+        """
+        with _refresh_lock_for(user_id):
+            with get_db() as db:
+                stored = db.query(OAuthToken).filter(
+                    OAuthToken.user_id == user_id
+                ).first()
+                if stored and stored.refresh_token != refresh_token:
+                    logger.info(f"Token for user {user_id} already refreshed, reusing it")
+                    return {
+                        "access_token": stored.access_token,
+                        "refresh_token": stored.refresh_token,
+                        "token_type": stored.token_type,
+                        "expires_in": max(_seconds_until(stored.expires_at), 0),
+                    }
+
+            token_data = self.refresh_access_token(refresh_token)
+            self.save_token(user_id, token_data)
+            return token_data
+
+    def refresh_session_token(self, user_id: str, session: OAuth2Session):
+        """
+        Refresh an authenticated session's expired token.
+
+        Sessions from create_authenticated_session don't auto-refresh; requests
+        on an expired token raise TokenExpiredError, and callers route the
+        refresh through here so it goes through refresh_user_token.
+
+        Args:
+            user_id: User identifier
+            session: Session whose token expired
+        """
+        token = session.token
+        if token.get("expires_at", 0) > time.time():
+            # Another thread sharing the session already refreshed it
+            return
+
+        token_data = self.refresh_user_token(user_id, token["refresh_token"])
+        session.token = _session_token(token_data, token["refresh_token"])
+
     def save_token(self, user_id: str, token_data: dict):
         """
         Save OAuth token to database.
@@ -192,6 +306,8 @@ class OuraOAuth:
             user_id: User identifier
             token_data: Token response from Oura API
         """
+        _invalidate_token(user_id)
+
         with get_db() as db:
             # Calculate token expiration (use UTC timezone-aware datetime)
             expires_in = token_data.get("expires_in", 86400)  # Default 24 hours
@@ -227,33 +343,47 @@ class OuraOAuth:
         """
         Get OAuth token from database, automatically refreshing if expired.
 
+        Valid tokens are cached in-process for up to TOKEN_CACHE_TTL seconds,
+        so repeated calls don't hit the database.
+
         Args:
             user_id: User identifier
 
         Returns:
-            OAuthToken instance or None
+            OAuthToken instance (detached from its session) or None
         """
+        cached = _token_cache.get(user_id)
+        if cached and time.monotonic() < cached[1] and not cached[0].is_expired():
+            return cached[0]
+
         with get_db() as db:
             token = db.query(OAuthToken).filter(
                 OAuthToken.user_id == user_id
             ).first()
 
-            if token and token.is_expired():
-                logger.info(f"Token expired for user {user_id}, refreshing...")
-                try:
-                    # Refresh token - this returns a NEW refresh token!
-                    new_token_data = self.refresh_access_token(token.refresh_token)
-                    self.save_token(user_id, new_token_data)
-                    # Get updated token
-                    token = db.query(OAuthToken).filter(
-                        OAuthToken.user_id == user_id
-                    ).first()
-                except Exception as e:
-                    logger.error(f"Failed to refresh token for user {user_id}: {e}")
-                    # Return None to indicate authentication is needed
-                    return None
+            if token:
+                # Detach so attributes stay readable after the session closes
+                db.expunge(token)
+
+        if token and token.is_expired():
+            logger.info(f"Token expired for user {user_id}, refreshing...")
+            try:
+                # Refresh token - this returns a NEW refresh token!
+                new_token_data = self.refresh_user_token(user_id, token.refresh_token)
+                # Apply the saved values to the detached token instead of re-querying
+                expires_in = new_token_data.get("expires_in", 86400)
+                token.access_token = new_token_data["access_token"]
+                token.refresh_token = new_token_data.get("refresh_token", token.refresh_token)
+                token.token_type = new_token_data.get("token_type", "Bearer")
+                token.expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+            except Exception as e:
+                logger.error(f"Failed to refresh token for user {user_id}: {e}")
+                # Return None to indicate authentication is needed
+                return None
 
-            return token
+        if token:
+            _cache_token(user_id, token)
+        return token
 
     def get_access_token(self, user_id: str) -> Optional[str]:
         """
@@ -271,7 +401,8 @@ class OuraOAuth:
     def create_authenticated_session(self, user_id: str) -> Optional[OAuth2Session]:
         """
         Create an OAuth2Session with a valid token for making API requests.
-        The session will automatically refresh tokens when they expire.
+        Once the token expires, requests raise TokenExpiredError; refresh it
+        with refresh_session_token.
 
         Args:
             user_id: User identifier
@@ -292,45 +423,30 @@ class OuraOAuth:
             if token_obj.is_expired():
                 logger.info(f"Token expired for user {user_id}, refreshing...")
                 try:
-                    new_token_data = self.refresh_access_token(token_obj.refresh_token)
-                    self.save_token(user_id, new_token_data)
-                    # Re-query to get fresh token
-                    token_obj = db.query(OAuthToken).filter(
-                        OAuthToken.user_id == user_id
-                    ).first()
+                    new_token_data = self.refresh_user_token(user_id, token_obj.refresh_token)
                 except Exception as e:
                     logger.error(f"Failed to refresh token for user {user_id}: {e}")
                     return None
 
-            # Extract all attributes while session is still active
-            # Ensure both datetimes are timezone-aware for comparison
-            now = datetime.now(timezone.utc)
-            expires_at = token_obj.expires_at
-
-            # If expires_at is naive, make it timezone-aware (assume UTC)
-            if expires_at.tzinfo is None:
-                expires_at = expires_at.replace(tzinfo=timezone.utc)
-
-            token_dict = {
-                'access_token': token_obj.access_token,
-                'refresh_token': token_obj.refresh_token,
-                'token_type': token_obj.token_type,
-                'expires_in': int((expires_at - now).total_seconds()),
-            }
-
-        # Create session that will auto-refresh and save via callback
-        def token_saver(token):
-            self.save_token(user_id, token)
-
+                # Build the session token straight from the refresh response
+                token_dict = _session_token(new_token_data, token_obj.refresh_token)
+            else:
+                # Extract all attributes while session is still active
+                expires_in = _seconds_until(token_obj.expires_at)
+                token_dict = {
+                    'access_token': token_obj.access_token,
+                    'refresh_token': token_obj.refresh_token,
+                    'token_type': token_obj.token_type,
+                    'expires_in': expires_in,
+                    'expires_at': time.time() + expires_in,
+                }
+
+        # No auto_refresh_url: requests-oauthlib's auto-refresh would bypass the
+        # per-user refresh lock, so expired tokens raise TokenExpiredError and
+        # callers refresh via refresh_session_token
         session = OAuth2Session(
             client_id=self.client_id,
             token=token_dict,
-            auto_refresh_url=self.TOKEN_URL,
-            auto_refresh_kwargs={
-                'client_id': self.client_id,
-                'client_secret': self.client_secret,
-            },
-            token_updater=token_saver
         )
 
         return session
\ No newline at end of file
@@ -1,58 +1,213 @@
 """Oura API client for fetching user data."""
+import threading
 import time
-from datetime import date, datetime
-from typing import Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from itertools import chain
+from typing import Iterable, Iterator, Optional, Union
+from urllib.parse import quote, urlencode
 
-from config import settings
+import orjson
+import requests
+from oauthlib.oauth2 import TokenExpiredError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import get_settings
 from services.oauth import OuraOAuth
 from utils import logger
 
 
+# Connection errors and transient server errors are retried with backoff
+# by the pooled adapter; 429 and 401 are still handled in _make_request
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    raise_on_status=False,
+)
+
+# One connection pool for the process, mounted on every client's session, so
+# TLS connections to the API are reused across clients, endpoints and threads.
+# Sized for concurrent data types times concurrent date chunks.
+_ADAPTER = HTTPAdapter(pool_connections=1, pool_maxsize=32, max_retries=_RETRY)
+
+# Shared session for legacy mode, where auth headers are passed per request
+_SESSION = requests.Session()
+_SESSION.mount("https://", _ADAPTER)
+
+
+# Requests are paced once fewer than this many remain in the rate-limit window
+RATE_LIMIT_LOW_WATER = 10
+
+# Rate-limit budget shared by all clients, from the latest response headers
+_rate_limit_lock = threading.Lock()
+_rate_limit_remaining: Optional[int] = None
+_rate_limit_reset_at = 0.0  # time.monotonic() at which the window resets
+
+
+def _update_rate_limit(headers) -> None:
+    """Record the remaining request budget from X-RateLimit-* response headers."""
+    global _rate_limit_remaining, _rate_limit_reset_at
+    remaining = headers.get("X-RateLimit-Remaining")
+    reset = headers.get("X-RateLimit-Reset")
+    if remaining is None or reset is None:
+        return
+    try:
+        remaining, reset = int(remaining), float(reset)
+    except ValueError:
+        return
+
+    # Reset may be an epoch timestamp or a number of seconds from now
+    if reset > 1e9:
+        reset -= time.time()
+    with _rate_limit_lock:
+        _rate_limit_remaining = remaining
+        _rate_limit_reset_at = time.monotonic() + max(reset, 0.0)
+
+
+def _rate_limit_delay() -> float:
+    """
+    Get how long to wait before the next request.
+
+    Once the budget runs low, the remaining requests are spread evenly over
+    the rest of the window instead of running into a 429.
+    """
+    global _rate_limit_remaining
+    with _rate_limit_lock:
+        if _rate_limit_remaining is None or _rate_limit_remaining >= RATE_LIMIT_LOW_WATER:
+            return 0.0
+        window = _rate_limit_reset_at - time.monotonic()
+        if window <= 0:
+            _rate_limit_remaining = None
+            return 0.0
+        delay = window / max(_rate_limit_remaining, 1)
+        # Count this request against the budget until the next response updates it
+        _rate_limit_remaining = max(_rate_limit_remaining - 1, 0)
+        return delay
+
+
+def date_chunks(start_date: str, end_date: str, days: int) -> list[tuple[str, str]]:
+    """
+    Split a date range into consecutive sub-ranges spanning at most `days` days.
+
+    Neighbouring chunks share their boundary day, so no day is missed whether
+    the API treats end_date as inclusive or exclusive.
+
+    Args:
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+        days: Maximum span of each chunk
+
+    Returns:
+        List of (start_date, end_date) tuples
+    """
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    step = timedelta(days=days)
+    chunks = []
+    while start + step < end:
+        chunks.append((start.isoformat(), (start + step).isoformat()))
+        start += step
+    chunks.append((start.isoformat(), end.isoformat()))
+    return chunks
+
+
 class OuraClient:
     """Client for interacting with Oura API."""
 
+    # Date ranges longer than CHUNK_DAYS are fetched as concurrent chunks
+    CHUNK_DAYS = 30
+    MAX_CHUNK_WORKERS = 4
+
+    # Cached auth headers are rebuilt this many seconds before the token expires
+    TOKEN_EXPIRY_BUFFER = 60
+
+    # get_* methods for the daily summary types, by data type
+    DAILY_METHODS = {
+        "daily_activity": "get_daily_activity",
+        "daily_sleep": "get_daily_sleep",
+        "daily_readiness": "get_daily_readiness",
+        "daily_spo2": "get_daily_spo2",
+        "daily_stress": "get_daily_stress",
+        "daily_resilience": "get_daily_resilience",
+        "daily_cardiovascular_age": "get_daily_cardiovascular_age",
+    }
+
+    # get_* methods taking (start_date, end_date), by data type, for fetch_all
+    DATE_RANGE_METHODS = {
+        **DAILY_METHODS,
+        "sleep": "get_sleep",
+        "sleep_time": "get_sleep_time",
+        "workout": "get_workouts",
+        "session": "get_sessions",
+        "tag": "get_tags",
+        "enhanced_tag": "get_enhanced_tags",
+        "rest_mode_period": "get_rest_mode_periods",
+        "vo2_max": "get_vo2_max",
+    }
+    MAX_FETCH_WORKERS = 8
+
     def __init__(self, user_id: str, use_oauth_session: bool = True):
         """
         Initialize Oura API client.
 
         Args:
             user_id: User identifier
-            use_oauth_session: If True, use OAuth2Session for automatic token refresh.
+            use_oauth_session: If True, send requests through the user's OAuth2Session;
+                              expired tokens raise TokenExpiredError and are refreshed
+                              via OuraOAuth.refresh_session_token.
                               If False, use manual token management (legacy mode).
         """
         self.user_id = user_id
-        self.base_url = settings.oura_api_base_url
+        self.base_url = get_settings().oura_api_base_url
         self.oauth = OuraOAuth()
         self.use_oauth_session = use_oauth_session
 
         if use_oauth_session:
-            # Create OAuth2Session that handles token refresh automatically
+            # Create OAuth2Session; expired tokens are refreshed in _make_request
             self._session = self.oauth.create_authenticated_session(user_id)
             if not self._session:
                 raise Exception(f"No valid authentication for user {user_id}")
+            self._session.mount("https://", _ADAPTER)
+            # Set on the per-user session rather than passed per request:
+            # OAuth2Session writes the Authorization header into the headers
+            # dict it is given, so a shared dict would leak tokens across users
+            self._session.headers["Content-Type"] = "application/json"
         else:
             # Legacy: manual token management
-            import requests
-            self._session = requests.Session()
+            self._session = _SESSION
+
+        # Legacy mode: auth headers, cached until shortly before the token expires
+        self._headers: Optional[dict] = None
+        self._headers_expire_at = 0.0
 
     def _get_headers(self) -> dict:
         """
-        Get authorization headers.
+        Get authorization headers, reused until the token is about to expire.
         Only used in legacy mode (use_oauth_session=False).
         """
-        access_token = self.oauth.get_access_token(self.user_id)
-        if not access_token:
+        if self._headers is not None and time.time() < self._headers_expire_at:
+            return self._headers
+
+        token = self.oauth.get_token(self.user_id)
+        if not token:
             raise Exception(f"No valid access token for user {self.user_id}")
 
-        return {
-            "Authorization": f"Bearer {access_token}",
+        self._headers = {
+            "Authorization": f"Bearer {token.access_token}",
             "Content-Type": "application/json"
         }
+        self._headers_expire_at = (
+            token.expires_at.timestamp() - self.TOKEN_EXPIRY_BUFFER
+            if token.expires_at else float("inf")
+        )
+        return self._headers
     
     def _make_request(
         self,
         endpoint: str,
-        params: Optional[dict] = None,
+        params: Optional[Union[dict, str]] = None,
         max_retries: int = 3
     ) -> dict:
         """
@@ -60,8 +215,8 @@ class OuraClient:
 
         Args:
             endpoint: API endpoint path
-            params: Query parameters
-            max_retries: Maximum number of retries
+            params: Query parameters, or an already encoded query string
+            max_retries: Maximum attempts for rate-limited or re-authenticated requests
 
         Returns:
             Response JSON data
@@ -70,13 +225,19 @@ class OuraClient:
 
         # OAuth2Session handles auth automatically, manual session needs headers
         if self.use_oauth_session:
-            headers = {"Content-Type": "application/json"}
+            headers = None
         else:
             headers = self._get_headers()
 
         for attempt in range(max_retries):
             try:
+                delay = _rate_limit_delay()
+                if delay:
+                    logger.debug("Rate-limit budget low, pacing request by %.2fs", delay)
+                    time.sleep(delay)
+
                 response = self._session.get(url, headers=headers, params=params)
+                _update_rate_limit(response.headers)
 
                 # Handle rate limiting
                 if response.status_code == 429:
@@ -86,30 +247,80 @@ class OuraClient:
                     continue
 
                 response.raise_for_status()
-                return response.json()
+                return orjson.loads(response.content)
+
+            except TokenExpiredError:
+                # OAuth mode: refresh through the per-user lock, then retry
+                logger.info("Token expired, refreshing...")
+                self.oauth.refresh_session_token(self.user_id, self._session)
+                continue
 
             except Exception as e:
-                # OAuth2Session automatically handles 401 via token refresh
-                # For legacy mode, handle manually
-                if not self.use_oauth_session and hasattr(e, 'response') and e.response.status_code == 401:
+                # Legacy mode: refresh and retry on 401
+                error_response = getattr(e, "response", None)
+                if not self.use_oauth_session and error_response is not None and error_response.status_code == 401:
                     logger.info("Token invalid, attempting refresh...")
                     token = self.oauth.get_token(self.user_id)
                     if token:
-                        new_token_data = self.oauth.refresh_access_token(token.refresh_token)
-                        self.oauth.save_token(self.user_id, new_token_data)
+                        self.oauth.refresh_user_token(self.user_id, token.refresh_token)
+                        self._headers = None
+                        headers = self._get_headers()
                         continue
                     raise
 
-                if attempt == max_retries - 1:
-                    logger.error(f"Request failed after {max_retries} attempts: {e}")
-                    raise
-
-                wait_time = 2 ** attempt  # Exponential backoff
-                logger.warning(f"Request failed, retrying in {wait_time}s... ({attempt + 1}/{max_retries})")
-                time.sleep(wait_time)
+                # Transient failures were already retried by the session adapter
+                logger.error(f"Request failed: {e}")
+                raise
 
         raise Exception(f"Failed to complete request after {max_retries} attempts")
     
+    def _iter_pages(self, endpoint: str, params: dict) -> Iterator[list[dict]]:
+        """
+        Yield the data items of each page of one query, following next_token.
+
+        Only one page is held at a time, so callers that process pages as they
+        arrive keep memory bounded regardless of the total result size.
+
+        Args:
+            endpoint: API endpoint
+            params: Query parameters for the first page
+
+        Yields:
+            List of data items in each page
+        """
+        # Encode the query once; later pages only append their next_token
+        page_query = urlencode(params)
+        next_prefix = f"{page_query}&next_token=" if page_query else "next_token="
+
+        # Bound once, outside the per-page loop
+        make_request = self._make_request
+        debug = logger.debug
+
+        while True:
+            response = make_request(endpoint, page_query)
+            yield response.get("data", [])
+            
+            # Check for next page
+            next_token = response.get("next_token")
+            if not next_token:
+                break
+            
+            page_query = next_prefix + quote(next_token, safe="")
+            debug("Fetching next page (token: %.20s...)", next_token)
+
+    def _fetch_pages(self, endpoint: str, params: dict) -> list[dict]:
+        """
+        Fetch all pages of one query by following next_token.
+
+        Args:
+            endpoint: API endpoint
+            params: Query parameters for the first page
+
+        Returns:
+            List of all data items
+        """
+        return list(chain.from_iterable(self._iter_pages(endpoint, params)))
+
     def _fetch_paginated_data(
         self,
         endpoint: str,
@@ -119,6 +330,9 @@ class OuraClient:
     ) -> list[dict]:
         """
         Fetch all pages of paginated data.
+
+        Long date ranges are split into chunks that are fetched concurrently;
+        pages within a chunk are still fetched in order.
         
         Args:
             endpoint: API endpoint
@@ -129,30 +343,78 @@ class OuraClient:
         Returns:
             List of all data items
         """
-        all_data = []
-        params = {**kwargs}
-        
-        if start_date:
-            params["start_date"] = start_date
-        if end_date:
-            params["end_date"] = end_date
-        
-        while True:
-            response = self._make_request(endpoint, params)
-            data = response.get("data", [])
-            all_data.extend(data)
-            
-            # Check for next page
-            next_token = response.get("next_token")
-            if not next_token:
-                break
-            
-            params["next_token"] = next_token
-            logger.debug(f"Fetching next page (token: {next_token[:20]}...)")
-        
+        chunks = [(start_date, end_date)]
+        if start_date and end_date:
+            chunks = date_chunks(start_date, end_date, self.CHUNK_DAYS)
+
+        chunk_params = []
+        for chunk_start, chunk_end in chunks:
+            params = {**kwargs}
+            if chunk_start:
+                params["start_date"] = chunk_start
+            if chunk_end:
+                params["end_date"] = chunk_end
+            chunk_params.append(params)
+
+        if len(chunk_params) == 1:
+            all_data = self._fetch_pages(endpoint, chunk_params[0])
+        else:
+            workers = min(len(chunk_params), self.MAX_CHUNK_WORKERS)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(lambda params: self._fetch_pages(endpoint, params), chunk_params)
+
+                # Chunks share their boundary day, so drop records already seen
+                all_data = []
+                seen_ids = set()
+                for data in results:
+                    for item in data:
+                        item_id = item.get("id")
+                        if item_id is not None:
+                            if item_id in seen_ids:
+                                continue
+                            seen_ids.add(item_id)
+                        all_data.append(item)
+
         logger.info(f"Fetched {len(all_data)} items from {endpoint}")
         return all_data
     
+    def fetch_all(
+        self,
+        start_date: str,
+        end_date: str,
+        data_types: Optional[Iterable[str]] = None
+    ) -> dict[str, list[dict]]:
+        """
+        Fetch several date-range data types concurrently.
+
+        Requests are network-bound, so running the endpoints on a thread pool
+        takes about as long as the slowest one rather than the sum of all.
+
+        Args:
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            data_types: Keys of DATE_RANGE_METHODS to fetch (default: all)
+
+        Returns:
+            Dictionary mapping each data type to its records
+        """
+        if data_types is None:
+            data_types = self.DATE_RANGE_METHODS
+        methods = {
+            data_type: getattr(self, self.DATE_RANGE_METHODS[data_type])
+            for data_type in data_types
+        }
+        if not methods:
+            return {}
+
+        workers = min(len(methods), self.MAX_FETCH_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                data_type: executor.submit(method, start_date, end_date)
+                for data_type, method in methods.items()
+            }
+            return {data_type: future.result() for data_type, future in futures.items()}
+
     # Personal Info
     def get_personal_info(self) -> dict:
         """Get user personal information."""
@@ -224,6 +486,17 @@ class OuraClient:
             end_datetime=end_datetime
         )
     
+    def iter_heart_rate(self, start_datetime: str, end_datetime: str) -> Iterator[dict]:
+        """
+        Iterate over heart rate samples, fetching one page at a time.
+
+        Use instead of get_heart_rate for long ranges, so samples can be
+        processed (e.g. written in batches) without holding them all in memory.
+        """
+        params = {"start_datetime": start_datetime, "end_datetime": end_datetime}
+        for data in self._iter_pages("/v2/usercollection/heartrate", params):
+            yield from data
+
     # Sleep Sessions
     def get_sleep(self, start_date: str, end_date: str) -> list[dict]:
         """Get sleep sessions data."""
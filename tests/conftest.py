@@ -0,0 +1,10 @@
+"""Shared pytest setup: make the project importable without a configured environment."""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Settings require OAuth credentials; tests never talk to the real API
+os.environ.setdefault("OURA_CLIENT_ID", "test-client-id")
+os.environ.setdefault("OURA_CLIENT_SECRET", "test-client-secret")
@@ -0,0 +1,94 @@
+"""Tests for the per-day record cache."""
+from datetime import date, timedelta
+
+import pytest
+
+from utils import cache
+from utils.cache import load_cached_days, store_days
+
+DAY = date(2024, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Point the cache at a temporary data directory."""
+    monkeypatch.setattr(cache, "get_data_dir", lambda: tmp_path)
+    return tmp_path / ".cache" / "daily_sleep" / "user"
+
+
+def record(day: date, score: int = 80) -> dict:
+    return {"id": day.isoformat(), "day": day.isoformat(), "score": score}
+
+
+def days(n: int) -> list[date]:
+    return [DAY + timedelta(days=i) for i in range(n)]
+
+
+def test_round_trip_returns_cached_records():
+    records = [record(d) for d in days(4)]
+    store_days("daily_sleep", "user", records, DAY, DAY + timedelta(days=4))
+
+    cached, fetch_start = load_cached_days("daily_sleep", "user", DAY, DAY + timedelta(days=3))
+
+    assert cached == records
+    assert fetch_start == DAY + timedelta(days=4)
+
+
+def test_load_narrows_range_to_first_missing_day(cache_dir):
+    d0, d1, d2, d3 = days(4)
+    store_days("daily_sleep", "user", [record(d0), record(d1), record(d3)], d0, d3 + timedelta(days=1))
+    (cache_dir / f"{d2.isoformat()}.ndjson").unlink()
+
+    cached, fetch_start = load_cached_days("daily_sleep", "user", d0, d3)
+
+    assert cached == [record(d0), record(d1)]
+    assert fetch_start == d2
+
+
+def test_empty_days_before_last_data_day_are_cached(cache_dir):
+    d0, d1, d2 = days(3)
+    store_days("daily_sleep", "user", [record(d0), record(d2)], d0, d2 + timedelta(days=1))
+
+    assert (cache_dir / f"{d1.isoformat()}.ndjson").read_bytes() == b""
+    cached, fetch_start = load_cached_days("daily_sleep", "user", d0, d2)
+    assert cached == [record(d0), record(d2)]
+    assert fetch_start == d2 + timedelta(days=1)
+
+
+def test_days_after_last_data_day_are_not_cached():
+    d0, d1, d2, d3 = days(4)
+    store_days("daily_sleep", "user", [record(d0), record(d1)], d0, d3 + timedelta(days=1))
+
+    cached, fetch_start = load_cached_days("daily_sleep", "user", d0, d3)
+
+    assert cached == [record(d0), record(d1)]
+    assert fetch_start == d2
+
+
+def test_range_without_records_is_not_cached(cache_dir):
+    store_days("daily_sleep", "user", [], DAY, DAY + timedelta(days=5))
+
+    assert not cache_dir.exists()
+    assert load_cached_days("daily_sleep", "user", DAY, DAY + timedelta(days=5)) == ([], DAY)
+
+
+def test_end_date_is_not_cached():
+    d0, d1 = days(2)
+    store_days("daily_sleep", "user", [record(d0), record(d1)], d0, d1)
+
+    cached, fetch_start = load_cached_days("daily_sleep", "user", d0, d1)
+
+    assert cached == [record(d0)]
+    assert fetch_start == d1
+
+
+def test_recent_days_are_not_cached():
+    today = date.today()
+    start = today - timedelta(days=cache.MUTABLE_DAYS + 2)
+    records = [record(start + timedelta(days=i)) for i in range(cache.MUTABLE_DAYS + 3)]
+    store_days("daily_sleep", "user", records, start, today + timedelta(days=1))
+
+    cached, fetch_start = load_cached_days("daily_sleep", "user", start, today)
+
+    assert fetch_start == today - timedelta(days=cache.MUTABLE_DAYS - 1)
+    assert cached == records[:3]
@@ -0,0 +1,24 @@
+"""Tests for the configuration package exports."""
+import importlib
+
+import config
+from config.settings import Settings, get_settings
+
+
+def test_package_settings_is_the_settings_instance():
+    assert isinstance(config.settings, Settings)
+    assert config.settings is get_settings()
+
+
+def test_legacy_settings_import():
+    from config import settings
+
+    assert isinstance(settings, Settings)
+    assert settings.oura_client_id
+
+
+def test_settings_submodule_still_importable():
+    settings_module = importlib.import_module("config.settings")
+
+    assert settings_module.get_settings is get_settings
+    assert isinstance(config.settings, Settings)
@@ -0,0 +1,113 @@
+"""Tests for database helpers, run against in-memory SQLite."""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from models.base import Base
+from models.daily_sleep import DailySleep
+from utils import database
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """An in-memory SQLite engine with every table created."""
+    engine = create_engine("sqlite://")
+    database._import_models()
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "get_engine", lambda: engine)
+    return engine
+
+
+def sleep_row(record_id: str, score: int, data_hash: str) -> dict:
+    return {
+        "id": record_id,
+        "user_id": "user",
+        "day": date(2025, 11, 5),
+        "timestamp": datetime(2025, 11, 5),
+        "score": score,
+        "raw_data": {"id": record_id, "score": score},
+        "data_hash": data_hash,
+    }
+
+
+def stored_scores(engine) -> dict[str, int]:
+    with Session(engine) as db:
+        return dict(db.execute(select(DailySleep.id, DailySleep.score)).all())
+
+
+def test_bulk_upsert_inserts_new_rows(engine):
+    with Session(engine) as db, db.begin():
+        database.bulk_upsert(db, DailySleep, [sleep_row("a", 70, "h1"), sleep_row("b", 80, "h2")])
+
+    assert stored_scores(engine) == {"a": 70, "b": 80}
+
+
+def test_bulk_upsert_updates_changed_and_skips_unchanged_rows(engine):
+    with Session(engine) as db, db.begin():
+        database.bulk_upsert(db, DailySleep, [sleep_row("a", 70, "h1"), sleep_row("b", 80, "h2")])
+    # Edit the stored row behind the hash's back: a skipped upsert keeps the edit
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE daily_sleep SET score = 0 WHERE id = 'b'"))
+
+    with Session(engine) as db, db.begin():
+        database.bulk_upsert(db, DailySleep, [
+            sleep_row("a", 75, "h1-changed"),
+            sleep_row("b", 85, "h2"),
+            sleep_row("c", 90, "h3"),
+        ])
+
+    assert stored_scores(engine) == {"a": 75, "b": 0, "c": 90}
+
+
+def test_bulk_upsert_splits_batches(engine, monkeypatch):
+    monkeypatch.setattr(database, "UPSERT_BATCH_SIZE", 2)
+    rows = [sleep_row(str(i), i, f"h{i}") for i in range(5)]
+
+    with Session(engine) as db, db.begin():
+        database.bulk_upsert(db, DailySleep, rows)
+
+    assert stored_scores(engine) == {str(i): i for i in range(5)}
+
+
+def set_clause(stmt) -> list[str]:
+    """Compile an upsert for PostgreSQL and return its SET assignments."""
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assignments = sql.split(" DO UPDATE SET ", 1)[1].split(" WHERE ", 1)[0]
+    return assignments.split(", ")
+
+
+def test_postgres_upsert_updates_all_but_id_and_created_at():
+    stmt = database._postgres_upsert(DailySleep, [sleep_row("a", 70, "h1")])
+
+    assignments = set_clause(stmt)
+    assert "updated_at = excluded.updated_at" in assignments
+    assert "score = excluded.score" in assignments
+    assert not [a for a in assignments if a.startswith(("id ", "created_at "))]
+
+
+def test_postgres_upsert_skips_unchanged_hashes():
+    stmt = database._postgres_upsert(DailySleep, [sleep_row("a", 70, "h1")])
+
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (id) DO UPDATE" in sql
+    assert sql.endswith("WHERE daily_sleep.data_hash IS DISTINCT FROM excluded.data_hash")
+
+
+def test_check_schema_passes_for_current_tables(engine):
+    database.check_schema()
+
+
+def test_check_schema_lists_missing_columns(engine):
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE daily_sleep"))
+        conn.execute(text("CREATE TABLE daily_sleep (id VARCHAR(255) PRIMARY KEY, user_id VARCHAR(255))"))
+
+    with pytest.raises(RuntimeError) as excinfo:
+        database.check_schema()
+
+    message = str(excinfo.value)
+    assert "ALTER TABLE daily_sleep ADD COLUMN data_hash VARCHAR(16);" in message
+    assert "ALTER TABLE daily_activity" not in message
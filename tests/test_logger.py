@@ -0,0 +1,40 @@
+"""Tests for the queued file logging setup."""
+import importlib
+
+import pytest
+
+logger_module = importlib.import_module("utils.logger")
+
+
+@pytest.fixture
+def logs_dir(tmp_path, monkeypatch):
+    """Write log files to a temporary directory and stop test listeners afterwards."""
+    monkeypatch.setattr(logger_module, "get_logs_dir", lambda: tmp_path)
+    yield tmp_path
+    for name in ("test_first", "test_second"):
+        logger_module._stop_file_listener(name)
+
+
+def test_configuring_another_logger_keeps_the_first_writing(logs_dir):
+    first = logger_module.setup_logger("test_first")
+    logger_module.setup_logger("test_second")
+
+    first.warning("still written")
+    logger_module._stop_file_listener("test_first")
+
+    assert "still written" in (logs_dir / "oura_sync.log").read_text()
+    assert "test_second" in logger_module._file_listeners
+
+
+def test_reconfiguring_a_logger_replaces_only_its_listener(logs_dir):
+    logger_module.setup_logger("test_first")
+    second = logger_module.setup_logger("test_second")
+    old_listener = logger_module._file_listeners["test_first"]
+
+    logger_module.setup_logger("test_first")
+
+    assert logger_module._file_listeners["test_first"] is not old_listener
+    assert all(handler.stream is None for handler in old_listener.handlers)
+    second.warning("second still written")
+    logger_module._stop_file_listener("test_second")
+    assert "second still written" in (logs_dir / "oura_sync.log").read_text()
@@ -1,22 +1,110 @@
 #!/usr/bin/env python3
-"""Test script to validate mappers with existing JSON data."""
-import json
+"""Mapper tests, plus a script to validate mappers with existing JSON data."""
 import sys
+from datetime import date, datetime, timezone
 from pathlib import Path
 
+import pytest
+
+try:
+    import ijson.backends.yajl2_c as ijson
+except ImportError:
+    import ijson
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.mappers import (
+    DICT_MAPPERS,
+    MAPPERS,
     map_daily_activity,
     map_daily_sleep,
+    map_daily_sleep_dict,
     map_daily_readiness,
     map_daily_spo2,
+    map_daily_spo2_dict,
     map_daily_stress,
 )
 
+SLEEP_RECORD = {
+    "id": "sleep-1",
+    "day": "2025-11-05",
+    "score": 82,
+    "timestamp": "2025-11-05T00:00:00+00:00",
+    "contributors": {
+        "deep_sleep": 90,
+        "efficiency": 85,
+        "latency": 70,
+        "rem_sleep": 95,
+        "restfulness": 60,
+        "timing": 100,
+        "total_sleep": 88,
+    },
+}
+
+# One minimal record per mapped type: required fields only, no nested objects
+MINIMAL_RECORDS = {
+    "daily_activity": {"id": "a-1", "day": "2025-11-05", "timestamp": "2025-11-05T04:00:00Z"},
+    "daily_sleep": {"id": "s-1", "day": "2025-11-05", "timestamp": "2025-11-05T00:00:00Z"},
+    "daily_readiness": {"id": "r-1", "day": "2025-11-05", "timestamp": "2025-11-05T00:00:00Z"},
+    "daily_spo2": {"id": "o-1", "day": "2025-11-05"},
+    "daily_stress": {"id": "t-1", "day": "2025-11-05"},
+}
+
+
+def test_sleep_row_matches_hand_written_mapping():
+    row = map_daily_sleep_dict(SLEEP_RECORD, "user")
+
+    assert row == {
+        "id": "sleep-1",
+        "user_id": "user",
+        "day": date(2025, 11, 5),
+        "score": 82,
+        "timestamp": datetime(2025, 11, 5, tzinfo=timezone.utc),
+        "deep_sleep": 90,
+        "efficiency": 85,
+        "latency": 70,
+        "rem_sleep": 95,
+        "restfulness": 60,
+        "timing": 100,
+        "total_sleep": 88,
+        "raw_data": SLEEP_RECORD,
+    }
+
+
+def test_missing_nested_object_maps_to_none():
+    record = {key: value for key, value in SLEEP_RECORD.items() if key != "contributors"}
+
+    row = map_daily_sleep_dict(record, "user")
+
+    assert row["score"] == 82
+    assert row["deep_sleep"] is None
+    assert row["total_sleep"] is None
+
+
+def test_nested_value_is_extracted():
+    record = {"id": "o-1", "day": "2025-11-05", "spo2_percentage": {"average": 97.5}}
+
+    assert map_daily_spo2_dict(record, "user")["spo2_percentage_average"] == 97.5
+
+
+def test_missing_required_field_raises():
+    with pytest.raises(KeyError):
+        map_daily_sleep_dict({"id": "s-1", "timestamp": "2025-11-05T00:00:00Z"}, "user")
+
+
+@pytest.mark.parametrize("data_type", sorted(MINIMAL_RECORDS))
+def test_model_mapper_matches_row_mapper(data_type):
+    record = MINIMAL_RECORDS[data_type]
+
+    row = DICT_MAPPERS[data_type](record, "user")
+    model = MAPPERS[data_type](record, "user")
+
+    assert set(row) >= {"id", "user_id", "day", "raw_data"}
+    assert {column: getattr(model, column) for column in row} == row
+
 
-def test_mapper(mapper_func, json_file: Path, data_type: str):
-    """Test a mapper function with JSON data."""
+def check_mapper(mapper_func, json_file: Path, data_type: str):
+    """Check a mapper function against a saved JSON file."""
     print(f"\n{'='*80}")
     print(f"Testing {data_type} mapper")
     print(f"{'='*80}")
@@ -27,18 +115,20 @@ def test_mapper(mapper_func, json_file: Path, data_type: str):
 
     try:
         # Load JSON data
-        with open(json_file) as f:
-            data_list = json.load(f)
+        # Stream records so only the first one is fully built in memory
+        with open(json_file, "rb") as f:
+            records = ijson.items(f, "item", use_float=True)
+            first_record = next(records, None)
+            record_count = 0 if first_record is None else 1 + sum(1 for _ in records)
 
-        print(f"✓ Loaded {len(data_list)} records from {json_file.name}")
+        print(f"✓ Loaded {record_count} records from {json_file.name}")
 
         # Test mapping first record
-        if not data_list:
+        if first_record is None:
             print("⚠ No records to test")
             return True
 
         test_user_id = "test_user_123"
-        first_record = data_list[0]
 
         print(f"\nTesting first record:")
         print(f"  ID: {first_record.get('id')}")
@@ -54,11 +144,13 @@ def test_mapper(mapper_func, json_file: Path, data_type: str):
 
         # Show some mapped fields
         print(f"\nSample mapped fields:")
-        for key, value in mapped.__dict__.items():
-            if not key.startswith("_") and key not in ["raw_data", "id", "user_id"]:
-                print(f"  {key}: {value}")
-                if len([k for k in mapped.__dict__.keys() if not k.startswith("_")]) > 10:
-                    break
+        fields = mapped.__dict__
+        printable = [
+            key for key in fields
+            if not key.startswith("_") and key not in ("raw_data", "id", "user_id")
+        ]
+        for key in printable[:10]:
+            print(f"  {key}: {fields[key]}")
 
         print(f"\n✓ {data_type} mapper test PASSED")
         return True
@@ -88,7 +180,7 @@ def main():
 
     results = []
     for mapper, json_file, data_type in tests:
-        result = test_mapper(mapper, json_file, data_type)
+        result = check_mapper(mapper, json_file, data_type)
         results.append((data_type, result))
 
     # Summary
@@ -0,0 +1,107 @@
+"""Tests for token refresh deduplication."""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.auth import OAuthToken
+from models.base import Base
+from services.oauth import OuraOAuth
+from utils import database
+
+
+@pytest.fixture
+def oauth(monkeypatch):
+    """An OuraOAuth backed by in-memory SQLite, with a stored token and a counting refresh."""
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine, tables=[OAuthToken.__table__])
+    monkeypatch.setattr(database, "get_session_factory", lambda: sessionmaker(bind=engine))
+
+    with database.get_db() as db:
+        db.add(OAuthToken(
+            user_id="user",
+            access_token="access-1",
+            refresh_token="refresh-1",
+            token_type="Bearer",
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+            scopes="",
+        ))
+
+    oauth = OuraOAuth()
+    oauth.refreshed = []
+
+    def refresh_access_token(refresh_token):
+        oauth.refreshed.append(refresh_token)
+        time.sleep(0.05)
+        n = len(oauth.refreshed) + 1
+        return {"access_token": f"access-{n}", "refresh_token": f"refresh-{n}", "expires_in": 3600}
+
+    monkeypatch.setattr(oauth, "refresh_access_token", refresh_access_token)
+    return oauth
+
+
+def stored_refresh_token(oauth) -> str:
+    with database.get_db() as db:
+        return db.execute(select(OAuthToken.refresh_token)).scalar_one()
+
+
+def test_refresh_saves_rotated_token(oauth):
+    token_data = oauth.refresh_user_token("user", "refresh-1")
+
+    assert token_data["access_token"] == "access-2"
+    assert oauth.refreshed == ["refresh-1"]
+    assert stored_refresh_token(oauth) == "refresh-2"
+
+
+def test_concurrent_refreshes_spend_the_token_once(oauth):
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(oauth.refresh_user_token("user", "refresh-1")))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert oauth.refreshed == ["refresh-1"]
+    assert {token["access_token"] for token in results} == {"access-2"}
+
+
+def test_late_refresh_with_rotated_token_reuses_stored_token(oauth):
+    oauth.refresh_user_token("user", "refresh-1")
+
+    token_data = oauth.refresh_user_token("user", "refresh-1")
+
+    assert oauth.refreshed == ["refresh-1"]
+    assert token_data["refresh_token"] == "refresh-2"
+    assert token_data["expires_in"] > 0
+
+
+def test_session_refresh_skips_already_refreshed_session(oauth):
+    class FakeSession:
+        token = {"refresh_token": "refresh-1", "expires_at": time.time() + 3600}
+
+    oauth.refresh_session_token("user", FakeSession())
+
+    assert oauth.refreshed == []
+
+
+def test_session_refresh_updates_expired_session(oauth):
+    class FakeSession:
+        token = {"refresh_token": "refresh-1", "expires_at": time.time() - 5}
+
+    session = FakeSession()
+    oauth.refresh_session_token("user", session)
+
+    assert oauth.refreshed == ["refresh-1"]
+    assert session.token["access_token"] == "access-2"
+    assert session.token["expires_at"] > time.time()
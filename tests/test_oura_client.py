@@ -0,0 +1,74 @@
+"""Tests for OuraClient helpers."""
+import pytest
+
+from services import oura_client
+from services.oura_client import OuraClient, date_chunks
+
+
+def test_date_chunks_share_boundary_days():
+    assert date_chunks("2025-01-01", "2025-01-25", 10) == [
+        ("2025-01-01", "2025-01-11"),
+        ("2025-01-11", "2025-01-21"),
+        ("2025-01-21", "2025-01-25"),
+    ]
+
+
+def test_date_chunks_short_range_is_one_chunk():
+    assert date_chunks("2025-01-01", "2025-01-10", 30) == [("2025-01-01", "2025-01-10")]
+    assert date_chunks("2025-01-01", "2025-01-31", 30) == [("2025-01-01", "2025-01-31")]
+
+
+def test_chunked_fetch_drops_boundary_duplicates(monkeypatch):
+    client = OuraClient.__new__(OuraClient)
+    pages = {
+        "2025-01-01": [{"id": "d1"}, {"id": "d31"}],
+        "2025-01-31": [{"id": "d31"}, {"id": "d45"}, {"note": "no id"}],
+    }
+    monkeypatch.setattr(client, "_fetch_pages", lambda endpoint, params: pages[params["start_date"]])
+
+    data = client._fetch_paginated_data("/usercollection/daily_sleep", "2025-01-01", "2025-02-15")
+
+    assert data == [{"id": "d1"}, {"id": "d31"}, {"id": "d45"}, {"note": "no id"}]
+
+
+@pytest.fixture
+def rate_limit(monkeypatch):
+    """Start every test with no known rate-limit budget."""
+    monkeypatch.setattr(oura_client, "_rate_limit_remaining", None)
+    monkeypatch.setattr(oura_client, "_rate_limit_reset_at", 0.0)
+
+
+def test_no_pacing_without_rate_limit_headers(rate_limit):
+    oura_client._update_rate_limit({})
+
+    assert oura_client._rate_limit_delay() == 0.0
+
+
+def test_no_pacing_while_budget_is_high(rate_limit):
+    oura_client._update_rate_limit({"X-RateLimit-Remaining": "100", "X-RateLimit-Reset": "60"})
+
+    assert oura_client._rate_limit_delay() == 0.0
+
+
+def test_low_budget_spreads_requests_over_window(rate_limit):
+    oura_client._update_rate_limit({"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "10"})
+
+    first = oura_client._rate_limit_delay()
+    second = oura_client._rate_limit_delay()
+
+    assert first == pytest.approx(2.0, abs=0.05)
+    # Each paced request is counted against the budget
+    assert second == pytest.approx(2.5, abs=0.05)
+
+
+def test_pacing_stops_once_window_resets(rate_limit):
+    oura_client._update_rate_limit({"X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "0"})
+
+    assert oura_client._rate_limit_delay() == 0.0
+    assert oura_client._rate_limit_remaining is None
+
+
+def test_daily_methods_are_date_range_methods():
+    assert OuraClient.DAILY_METHODS.items() <= OuraClient.DATE_RANGE_METHODS.items()
+    for method in OuraClient.DATE_RANGE_METHODS.values():
+        assert callable(getattr(OuraClient, method))
@@ -0,0 +1,19 @@
+"""Tests for the sync script's database statements."""
+from sqlalchemy.dialects import postgresql
+
+from scripts.sync_data import personal_info_upsert
+
+
+def test_personal_info_upsert_updates_api_fields_and_timestamp():
+    values = {"id": "p-1", "user_id": "user", "age": 30, "email": "a@example.com"}
+
+    stmt = personal_info_upsert(values, ["age", "email"])
+
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assignments = sql.split(" DO UPDATE SET ", 1)[1].split(", ")
+    assert "ON CONFLICT (id) DO UPDATE" in sql
+    assert sorted(assignments) == [
+        "age = excluded.age",
+        "email = excluded.email",
+        "updated_at = excluded.updated_at",
+    ]
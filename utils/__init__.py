@@ -1,5 +1,5 @@
 """Utilities package."""
-from .database import get_db, init_database, drop_all_tables
+from .database import bulk_upsert, check_schema, get_db, init_database, drop_all_tables
 from .logger import logger, setup_logger
 
-__all__ = ["get_db", "init_database", "drop_all_tables", "logger", "setup_logger"]
\ No newline at end of file
+__all__ = ["bulk_upsert", "check_schema", "get_db", "init_database", "drop_all_tables", "logger", "setup_logger"]
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""On-disk cache of daily Oura records, stored as one NDJSON file per day."""
+from datetime import date, timedelta
+from pathlib import Path
+
+import orjson
+
+from config import get_data_dir
+from utils.logger import logger
+
+# Days this close to today can still change on Oura's side and are never cached
+MUTABLE_DAYS = 2
+
+
+def dump_records(path: Path, records: list[dict]):
+    """Write records as NDJSON (one compact JSON object per line)."""
+    path.write_bytes(b"".join(orjson.dumps(record) + b"\n" for record in records))
+
+
+def load_records(path: Path) -> list[dict]:
+    """Read records written by dump_records."""
+    return [orjson.loads(line) for line in path.read_bytes().splitlines() if line]
+
+
+def get_cache_dir(data_type: str, user_id: str) -> Path:
+    """Get the cache directory for a data type and user."""
+    return get_data_dir() / ".cache" / data_type / user_id
+
+
+def load_cached_days(data_type: str, user_id: str, start_date: date, end_date: date) -> tuple[list[dict], date]:
+    """
+    Load cached records for the leading run of cached days in a date range.
+
+    Args:
+        data_type: Data type (e.g. "daily_sleep")
+        user_id: User identifier
+        start_date: First day of the range
+        end_date: Last day of the range
+
+    Returns:
+        Tuple of (cached records, first day that still needs fetching)
+    """
+    cache_dir = get_cache_dir(data_type, user_id)
+    records = []
+    day = start_date
+    while day <= end_date:
+        try:
+            records.extend(load_records(cache_dir / f"{day.isoformat()}.ndjson"))
+        except FileNotFoundError:
+            break
+        day += timedelta(days=1)
+    return records, day
+
+
+def store_days(data_type: str, user_id: str, records: list[dict], start_date: date, end_date: date):
+    """
+    Cache fetched records per day, for days that can no longer change.
+
+    Only days up to the last one that returned records are cached: later days
+    may simply not be processed yet, so caching them empty would hide data that
+    arrives afterwards. Empty days before that one are cached as empty files so
+    they aren't fetched again. The last day of the range is skipped because the
+    API may treat end_date as exclusive.
+
+    Args:
+        data_type: Data type (e.g. "daily_sleep")
+        user_id: User identifier
+        records: Records returned by the API for the range
+        start_date: First day of the fetched range
+        end_date: Last day of the fetched range
+    """
+    by_day: dict[str, list[dict]] = {}
+    for record in records:
+        by_day.setdefault(record.get("day"), []).append(record)
+
+    days_with_data = [key for key in by_day if key]
+    if not days_with_data:
+        return
+
+    last_day = min(
+        end_date - timedelta(days=1),
+        date.today() - timedelta(days=MUTABLE_DAYS),
+        date.fromisoformat(max(days_with_data)),
+    )
+    if start_date > last_day:
+        return
+
+    cache_dir = get_cache_dir(data_type, user_id)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        day = start_date
+        while day <= last_day:
+            key = day.isoformat()
+            dump_records(cache_dir / f"{key}.ndjson", by_day.get(key, []))
+            day += timedelta(days=1)
+    except OSError as e:
+        logger.warning(f"Failed to cache {data_type} days: {e}")
@@ -1,19 +1,65 @@
 """Database connection and session management."""
+import importlib
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Generator
 
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import create_engine, event, insert, inspect, select, update
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session, sessionmaker
 
-from config import settings
+from config import get_settings
 from models.base import Base
 from utils.logger import logger
 
 
+# Rows per upsert statement; keeps multi-row VALUES under driver parameter limits
+UPSERT_BATCH_SIZE = 1000
+
+# Model modules, imported so every table is registered with Base.metadata
+_MODEL_MODULES = (
+    "models.auth",
+    "models.daily_activity",
+    "models.daily_cardiovascular_age",
+    "models.daily_readiness",
+    "models.daily_resilience",
+    "models.daily_sleep",
+    "models.daily_spo2",
+    "models.daily_stress",
+    "models.heart_rate",
+    "models.personal_info",
+    "models.rest_mode_period",
+    "models.ring_configuration",
+    "models.session",
+    "models.sleep",
+    "models.sleep_time",
+    "models.tag",
+    "models.vo2_max",
+    "models.workout",
+)
+
 # Create engine
 _engine = None
 _SessionLocal = None
 
+# Set once init_database has created the schema in this process
+_schema_initialized = False
+
+
+def _json_serializer(value: Any) -> str:
+    """Serialize JSON columns with orjson."""
+    return orjson.dumps(value).decode()
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL journaling and fewer fsyncs on each new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
 
 def get_engine():
     """
@@ -24,14 +70,19 @@ def get_engine():
     """
     global _engine
     if _engine is None:
-        database_url = settings.database_url_constructed
+        database_url = get_settings().database_url_constructed
         _engine = create_engine(
             database_url,
             echo=False,  # Set to True for SQL query logging
-            pool_pre_ping=True,  # Verify connections before using
-            pool_size=5,
-            max_overflow=10
+            pool_size=10,
+            max_overflow=20,
+            pool_timeout=10,  # Fail fast instead of queueing for 30s
+            pool_recycle=1800,  # Replace connections before servers drop idle ones
+            json_serializer=_json_serializer,
+            json_deserializer=orjson.loads
         )
+        if _engine.url.get_backend_name() == "sqlite":
+            event.listen(_engine, "connect", _set_sqlite_pragmas)
         logger.info(f"Database engine created for: {database_url.split('@')[-1]}")
     return _engine
 
@@ -84,76 +135,145 @@ def get_db() -> Generator[Session, None, None]:
         logger.debug("Database session closed")
 
 
+def _postgres_upsert(model_class, rows: list[dict]):
+    """Build an INSERT ... ON CONFLICT DO UPDATE that leaves rows with an unchanged data_hash alone."""
+    stmt = postgresql.insert(model_class).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[model_class.id],
+        set_={
+            column.name: column
+            for column in stmt.excluded
+            if column.name not in ("id", "created_at")
+        },
+        where=model_class.data_hash.is_distinct_from(stmt.excluded.data_hash)
+    )
+
+
+def _upsert_batch(db: Session, model_class, rows: list[dict]):
+    """Upsert one batch of rows (see bulk_upsert)."""
+    if db.get_bind().dialect.name == "postgresql":
+        # Single INSERT ... ON CONFLICT DO UPDATE instead of a
+        # SELECT + INSERT/UPDATE round-trip per record
+        db.execute(_postgres_upsert(model_class, rows))
+        return
+
+    # No native upsert: fetch existing IDs and hashes in one query, then
+    # issue one batched INSERT and one batched UPDATE (by primary key)
+    ids = [row["id"] for row in rows]
+    existing_hashes = dict(db.execute(
+        select(model_class.id, model_class.data_hash).where(model_class.id.in_(ids))
+    ).all())
+    new_rows = [row for row in rows if row["id"] not in existing_hashes]
+    updated_rows = [
+        row for row in rows
+        if row["id"] in existing_hashes and existing_hashes[row["id"]] != row["data_hash"]
+    ]
+
+    if new_rows:
+        db.execute(insert(model_class), new_rows)
+    if updated_rows:
+        db.execute(update(model_class), updated_rows)
+
+
+def bulk_upsert(db: Session, model_class, rows: list[dict]):
+    """
+    Insert new rows and update changed ones with Core statements, in batches.
+
+    Rows whose data_hash matches the stored one are left untouched.
+
+    Args:
+        db: Database session
+        model_class: Model to write to
+        rows: Column dicts, each including the primary key "id" and "data_hash"
+    """
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        _upsert_batch(db, model_class, rows[start:start + UPSERT_BATCH_SIZE])
+
+
+def _import_models():
+    """Import every model module so its table is registered with Base."""
+    for module in _MODEL_MODULES:
+        importlib.import_module(module)
+
+
 def init_database():
     """
     Initialize the database by creating all tables.
 
     This creates all tables defined in SQLAlchemy models that inherit from Base.
+    Runs at most once per process, since create_all inspects every table.
     """
+    global _schema_initialized
+    if _schema_initialized:
+        return
+
     try:
         engine = get_engine()
 
-        # Import all models to ensure they're registered with Base
-        # This is necessary for Base.metadata.create_all() to work
-        from models.auth import OAuthToken
-        from models.daily_activity import DailyActivity
-        from models.daily_cardiovascular_age import DailyCardiovascularAge
-        from models.daily_readiness import DailyReadiness
-        from models.daily_resilience import DailyResilience
-        from models.daily_sleep import DailySleep
-        from models.daily_spo2 import DailySpo2
-        from models.daily_stress import DailyStress
-        from models.heart_rate import HeartRate
-        from models.personal_info import PersonalInfo
-        from models.rest_mode_period import RestModePeriod
-        from models.ring_configuration import RingConfiguration
-        from models.session import Session as SessionModel
-        from models.sleep import Sleep
-        from models.sleep_time import SleepTime
-        from models.tag import Tag
-        from models.vo2_max import Vo2Max
-        from models.workout import Workout
+        # Register every model with Base before creating tables
+        _import_models()
 
         # Create all tables
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully")
 
+        # create_all skips existing tables, so check they aren't missing columns
+        check_schema()
+        _schema_initialized = True
+
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
 
 
+def check_schema():
+    """
+    Verify that existing tables have every column the models define.
+
+    create_all never alters tables that already exist, so databases created by
+    an older version keep their old columns and fail on the first insert.
+
+    Raises:
+        RuntimeError: Listing the ALTER TABLE statements that add the missing columns
+    """
+    engine = get_engine()
+    _import_models()
+
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in present:
+                column_type = column.type.compile(dialect=engine.dialect)
+                statements.append(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type};")
+
+    if statements:
+        raise RuntimeError(
+            "Database schema is out of date. Add the missing columns, then re-run:\n    "
+            + "\n    ".join(statements)
+        )
+
+
 def drop_all_tables():
     """
     Drop all tables from the database.
 
     WARNING: This will delete all data! Use with caution.
     """
+    global _schema_initialized
     try:
         engine = get_engine()
 
-        # Import all models to ensure they're registered with Base
-        from models.auth import OAuthToken
-        from models.daily_activity import DailyActivity
-        from models.daily_cardiovascular_age import DailyCardiovascularAge
-        from models.daily_readiness import DailyReadiness
-        from models.daily_resilience import DailyResilience
-        from models.daily_sleep import DailySleep
-        from models.daily_spo2 import DailySpo2
-        from models.daily_stress import DailyStress
-        from models.heart_rate import HeartRate
-        from models.personal_info import PersonalInfo
-        from models.rest_mode_period import RestModePeriod
-        from models.ring_configuration import RingConfiguration
-        from models.session import Session as SessionModel
-        from models.sleep import Sleep
-        from models.sleep_time import SleepTime
-        from models.tag import Tag
-        from models.vo2_max import Vo2Max
-        from models.workout import Workout
+        # Register every model with Base before dropping tables
+        _import_models()
 
         # Drop all tables
         Base.metadata.drop_all(bind=engine)
+        _schema_initialized = False
         logger.info("All database tables dropped")
 
     except Exception as e:
@@ -1,11 +1,32 @@
 """Logging configuration."""
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 import colorlog
 
-from config import settings, get_logs_dir
+from config import get_settings, get_logs_dir
+
+# Background threads writing queued records to the log file, by logger name
+_file_listeners: dict[str, QueueListener] = {}
+
+
+def _stop_file_listener(name: str):
+    """Flush a logger's queued records to the log file, stop its listener thread and close the file."""
+    listener = _file_listeners.pop(name, None)
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def _stop_file_listeners():
+    """Stop the file listeners of every configured logger."""
+    for name in list(_file_listeners):
+        _stop_file_listener(name)
 
 
 def setup_logger(name: str = "oura_sync") -> logging.Logger:
@@ -19,7 +40,7 @@ def setup_logger(name: str = "oura_sync") -> logging.Logger:
         Configured logger instance
     """
     logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, settings.log_level.upper()))
+    logger.setLevel(getattr(logging, get_settings().log_level.upper()))
     
     # Remove existing handlers
     logger.handlers.clear()
@@ -52,10 +73,21 @@ def setup_logger(name: str = "oura_sync") -> logging.Logger:
         datefmt="%Y-%m-%d %H:%M:%S"
     )
     file_handler.setFormatter(file_format)
-    logger.addHandler(file_handler)
+
+    # Records for the file are still formatted on the logging thread (by
+    # QueueHandler.prepare), but the disk writes happen on a listener thread.
+    # Console output stays synchronous so it keeps its order relative to
+    # print() output.
+    _stop_file_listener(name)
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    _file_listeners[name] = listener
     
     return logger
 
 
 # Global logger instance
-logger = setup_logger()
\ No newline at end of file
+logger = setup_logger()
+atexit.register(_stop_file_listeners)
\ No newline at end of file
@@ -1,7 +1,6 @@
 """Mappers to convert JSON data from Oura API to database models."""
-import json
-from datetime import datetime
-from typing import Any
+from datetime import date, datetime
+from typing import Any, Callable, Union
 
 from models.daily_activity import DailyActivity
 from models.daily_readiness import DailyReadiness
@@ -9,6 +8,171 @@ from models.daily_sleep import DailySleep
 from models.daily_spo2 import DailySpo2
 from models.daily_stress import DailyStress
 
+# Source of a column value: a (dotted) field name, or (field, parser) for required fields
+FieldSource = Union[str, tuple[str, Callable[[Any], Any]]]
+RowMapper = Callable[[dict[str, Any], str], dict[str, Any]]
+
+
+def _parse_day(value: str) -> date:
+    """Parse an API day (YYYY-MM-DD)."""
+    return date.fromisoformat(value)
+
+
+try:
+    # Optional C parser, several times faster than datetime.fromisoformat
+    from ciso8601 import parse_datetime as _parse_ts
+except ImportError:
+    def _parse_ts(value: str) -> datetime:
+        """Parse an API timestamp, accepting a trailing "Z" for UTC."""
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        return datetime.fromisoformat(value)
+
+
+# Field specs: column name -> source field in the API record. Dotted
+# sources read from a nested object (missing objects count as empty).
+# A (source, parser) tuple marks a required field, passed through parser.
+# id, user_id and raw_data are added to every row.
+
+DAILY_SLEEP_SPEC: dict[str, FieldSource] = {
+    # Core fields
+    "day": ("day", _parse_day),
+    "score": "score",
+    "timestamp": ("timestamp", _parse_ts),
+    # Contributors - extracted from nested object
+    "deep_sleep": "contributors.deep_sleep",
+    "efficiency": "contributors.efficiency",
+    "latency": "contributors.latency",
+    "rem_sleep": "contributors.rem_sleep",
+    "restfulness": "contributors.restfulness",
+    "timing": "contributors.timing",
+    "total_sleep": "contributors.total_sleep",
+}
+
+DAILY_READINESS_SPEC: dict[str, FieldSource] = {
+    # Core fields
+    "day": ("day", _parse_day),
+    "score": "score",
+    "timestamp": ("timestamp", _parse_ts),
+    "temperature_deviation": "temperature_deviation",
+    "temperature_trend_deviation": "temperature_trend_deviation",
+    # Contributors - extracted from nested object
+    "activity_balance": "contributors.activity_balance",
+    "body_temperature": "contributors.body_temperature",
+    "hrv_balance": "contributors.hrv_balance",
+    "previous_day_activity": "contributors.previous_day_activity",
+    "previous_night": "contributors.previous_night",
+    "recovery_index": "contributors.recovery_index",
+    "resting_heart_rate": "contributors.resting_heart_rate",
+    "sleep_balance": "contributors.sleep_balance",
+    "sleep_regularity": "contributors.sleep_regularity",
+}
+
+DAILY_SPO2_SPEC: dict[str, FieldSource] = {
+    # Core fields
+    "day": ("day", _parse_day),
+    "breathing_disturbance_index": "breathing_disturbance_index",
+    "spo2_percentage_average": "spo2_percentage.average",
+}
+
+DAILY_STRESS_SPEC: dict[str, FieldSource] = {
+    # Core fields
+    "day": ("day", _parse_day),
+    "day_summary": "day_summary",
+    "recovery_high": "recovery_high",
+    "stress_high": "stress_high",
+}
+
+DAILY_ACTIVITY_SPEC: dict[str, FieldSource] = {
+    # Core fields
+    "day": ("day", _parse_day),
+    "score": "score",
+    "timestamp": ("timestamp", _parse_ts),
+    # Activity metrics
+    "active_calories": "active_calories",
+    "average_met_minutes": "average_met_minutes",
+    "equivalent_walking_distance": "equivalent_walking_distance",
+    "high_activity_met_minutes": "high_activity_met_minutes",
+    "high_activity_time": "high_activity_time",
+    "inactivity_alerts": "inactivity_alerts",
+    "low_activity_met_minutes": "low_activity_met_minutes",
+    "low_activity_time": "low_activity_time",
+    "medium_activity_met_minutes": "medium_activity_met_minutes",
+    "medium_activity_time": "medium_activity_time",
+    "meters_to_target": "meters_to_target",
+    "non_wear_time": "non_wear_time",
+    "resting_time": "resting_time",
+    "sedentary_met_minutes": "sedentary_met_minutes",
+    "sedentary_time": "sedentary_time",
+    "steps": "steps",
+    "target_calories": "target_calories",
+    "target_meters": "target_meters",
+    "total_calories": "total_calories",
+    # Activity classification
+    "class_5_min": "class_5_min",
+    # MET interval - extracted from nested object (met.items stays in raw_data)
+    "met_interval": "met.interval",
+    # Contributors - extracted from nested object
+    "meet_daily_targets": "contributors.meet_daily_targets",
+    "move_every_hour": "contributors.move_every_hour",
+    "recovery_time": "contributors.recovery_time",
+    "stay_active": "contributors.stay_active",
+    "training_frequency": "contributors.training_frequency",
+    "training_volume": "contributors.training_volume",
+}
+
+
+def build_row_mapper(model_class: type, spec: dict[str, FieldSource]) -> RowMapper:
+    """Compile a field spec into a function mapping an API record to a row dict.
+
+    The spec is turned into straight-line source (one dict literal) and
+    compiled once, so mapping a record costs the same as a hand-written mapper.
+
+    Args:
+        model_class: Model the rows are for (used for naming and docs)
+        spec: Field spec (see DAILY_SLEEP_SPEC)
+
+    Returns:
+        Function taking (data, user_id) and returning column values
+    """
+    namespace: dict[str, Any] = {}
+    nested: list[str] = []
+    items = ['"id": data["id"]', '"user_id": user_id']
+    for column, source in spec.items():
+        if isinstance(source, tuple):
+            field, parser = source
+            namespace[f"_parse_{column}"] = parser
+            items.append(f"{column!r}: _parse_{column}(data[{field!r}])")
+        elif "." in source:
+            parent, field = source.split(".", 1)
+            if parent not in nested:
+                nested.append(parent)
+            items.append(f"{column!r}: _{parent}.get({field!r})")
+        else:
+            items.append(f"{column!r}: data.get({source!r})")
+    items.append('"raw_data": data')
+
+    lines = ["def mapper(data, user_id):"]
+    lines += [f"    _{parent} = data.get({parent!r}, {{}})" for parent in nested]
+    lines.append("    return {")
+    lines += [f"        {item}," for item in items]
+    lines.append("    }")
+
+    exec("\n".join(lines), namespace)
+    mapper = namespace["mapper"]
+    name = f"map_{model_class.__tablename__}_dict"
+    mapper.__name__ = mapper.__qualname__ = name
+    mapper.__module__ = __name__
+    mapper.__doc__ = f"Map JSON data from Oura API to a {model_class.__name__} row dict."
+    return mapper
+
+
+map_daily_sleep_dict = build_row_mapper(DailySleep, DAILY_SLEEP_SPEC)
+map_daily_readiness_dict = build_row_mapper(DailyReadiness, DAILY_READINESS_SPEC)
+map_daily_spo2_dict = build_row_mapper(DailySpo2, DAILY_SPO2_SPEC)
+map_daily_stress_dict = build_row_mapper(DailyStress, DAILY_STRESS_SPEC)
+map_daily_activity_dict = build_row_mapper(DailyActivity, DAILY_ACTIVITY_SPEC)
+
 
 def map_daily_sleep(data: dict[str, Any], user_id: str) -> DailySleep:
     """Map JSON data to DailySleep model.
@@ -20,26 +184,7 @@ def map_daily_sleep(data: dict[str, Any], user_id: str) -> DailySleep:
     Returns:
         DailySleep model instance
     """
-    contributors = data.get("contributors", {})
-
-    return DailySleep(
-        id=data["id"],
-        user_id=user_id,
-        # Core fields
-        day=datetime.strptime(data["day"], "%Y-%m-%d").date(),
-        score=data.get("score"),
-        timestamp=datetime.fromisoformat(data["timestamp"].replace("Z", "+00:00")),
-        # Contributors - extracted from nested object
-        deep_sleep=contributors.get("deep_sleep"),
-        efficiency=contributors.get("efficiency"),
-        latency=contributors.get("latency"),
-        rem_sleep=contributors.get("rem_sleep"),
-        restfulness=contributors.get("restfulness"),
-        timing=contributors.get("timing"),
-        total_sleep=contributors.get("total_sleep"),
-        # Store complete JSON
-        raw_data=json.dumps(data)
-    )
+    return DailySleep(**map_daily_sleep_dict(data, user_id))
 
 
 def map_daily_readiness(data: dict[str, Any], user_id: str) -> DailyReadiness:
@@ -52,30 +197,7 @@ def map_daily_readiness(data: dict[str, Any], user_id: str) -> DailyReadiness:
     Returns:
         DailyReadiness model instance
     """
-    contributors = data.get("contributors", {})
-
-    return DailyReadiness(
-        id=data["id"],
-        user_id=user_id,
-        # Core fields
-        day=datetime.strptime(data["day"], "%Y-%m-%d").date(),
-        score=data.get("score"),
-        timestamp=datetime.fromisoformat(data["timestamp"].replace("Z", "+00:00")),
-        temperature_deviation=data.get("temperature_deviation"),
-        temperature_trend_deviation=data.get("temperature_trend_deviation"),
-        # Contributors - extracted from nested object
-        activity_balance=contributors.get("activity_balance"),
-        body_temperature=contributors.get("body_temperature"),
-        hrv_balance=contributors.get("hrv_balance"),
-        previous_day_activity=contributors.get("previous_day_activity"),
-        previous_night=contributors.get("previous_night"),
-        recovery_index=contributors.get("recovery_index"),
-        resting_heart_rate=contributors.get("resting_heart_rate"),
-        sleep_balance=contributors.get("sleep_balance"),
-        sleep_regularity=contributors.get("sleep_regularity"),
-        # Store complete JSON
-        raw_data=json.dumps(data)
-    )
+    return DailyReadiness(**map_daily_readiness_dict(data, user_id))
 
 
 def map_daily_spo2(data: dict[str, Any], user_id: str) -> DailySpo2:
@@ -88,18 +210,7 @@ def map_daily_spo2(data: dict[str, Any], user_id: str) -> DailySpo2:
     Returns:
         DailySpo2 model instance
     """
-    spo2_percentage = data.get("spo2_percentage", {})
-
-    return DailySpo2(
-        id=data["id"],
-        user_id=user_id,
-        # Core fields
-        day=datetime.strptime(data["day"], "%Y-%m-%d").date(),
-        breathing_disturbance_index=data.get("breathing_disturbance_index"),
-        spo2_percentage_average=spo2_percentage.get("average"),
-        # Store complete JSON
-        raw_data=json.dumps(data)
-    )
+    return DailySpo2(**map_daily_spo2_dict(data, user_id))
 
 
 def map_daily_stress(data: dict[str, Any], user_id: str) -> DailyStress:
@@ -112,17 +223,7 @@ def map_daily_stress(data: dict[str, Any], user_id: str) -> DailyStress:
     Returns:
         DailyStress model instance
     """
-    return DailyStress(
-        id=data["id"],
-        user_id=user_id,
-        # Core fields
-        day=datetime.strptime(data["day"], "%Y-%m-%d").date(),
-        day_summary=data.get("day_summary"),
-        recovery_high=data.get("recovery_high"),
-        stress_high=data.get("stress_high"),
-        # Store complete JSON
-        raw_data=json.dumps(data)
-    )
+    return DailyStress(**map_daily_stress_dict(data, user_id))
 
 
 def map_daily_activity(data: dict[str, Any], user_id: str) -> DailyActivity:
@@ -135,50 +236,7 @@ def map_daily_activity(data: dict[str, Any], user_id: str) -> DailyActivity:
     Returns:
         DailyActivity model instance
     """
-    contributors = data.get("contributors", {})
-    met = data.get("met", {})
-
-    return DailyActivity(
-        id=data["id"],
-        user_id=user_id,
-        # Core fields
-        day=datetime.strptime(data["day"], "%Y-%m-%d").date(),
-        score=data.get("score"),
-        timestamp=datetime.fromisoformat(data["timestamp"].replace("Z", "+00:00")),
-        # Activity metrics
-        active_calories=data.get("active_calories"),
-        average_met_minutes=data.get("average_met_minutes"),
-        equivalent_walking_distance=data.get("equivalent_walking_distance"),
-        high_activity_met_minutes=data.get("high_activity_met_minutes"),
-        high_activity_time=data.get("high_activity_time"),
-        inactivity_alerts=data.get("inactivity_alerts"),
-        low_activity_met_minutes=data.get("low_activity_met_minutes"),
-        low_activity_time=data.get("low_activity_time"),
-        medium_activity_met_minutes=data.get("medium_activity_met_minutes"),
-        medium_activity_time=data.get("medium_activity_time"),
-        meters_to_target=data.get("meters_to_target"),
-        non_wear_time=data.get("non_wear_time"),
-        resting_time=data.get("resting_time"),
-        sedentary_met_minutes=data.get("sedentary_met_minutes"),
-        sedentary_time=data.get("sedentary_time"),
-        steps=data.get("steps"),
-        target_calories=data.get("target_calories"),
-        target_meters=data.get("target_meters"),
-        total_calories=data.get("total_calories"),
-        # Activity classification
-        class_5_min=data.get("class_5_min"),
-        # MET interval - extracted from nested object
-        met_interval=met.get("interval"),
-        # Contributors - extracted from nested object
-        meet_daily_targets=contributors.get("meet_daily_targets"),
-        move_every_hour=contributors.get("move_every_hour"),
-        recovery_time=contributors.get("recovery_time"),
-        stay_active=contributors.get("stay_active"),
-        training_frequency=contributors.get("training_frequency"),
-        training_volume=contributors.get("training_volume"),
-        # Store complete JSON (includes met.items array and timestamp)
-        raw_data=json.dumps(data)
-    )
+    return DailyActivity(**map_daily_activity_dict(data, user_id))
 
 
 # Mapper registry for easy lookup
@@ -189,3 +247,21 @@ MAPPERS = {
     "daily_spo2": map_daily_spo2,
     "daily_stress": map_daily_stress,
 }
+
+# Row dict mapper registry, for bulk writes that skip ORM instances
+DICT_MAPPERS = {
+    "daily_activity": map_daily_activity_dict,
+    "daily_sleep": map_daily_sleep_dict,
+    "daily_readiness": map_daily_readiness_dict,
+    "daily_spo2": map_daily_spo2_dict,
+    "daily_stress": map_daily_stress_dict,
+}
+
+# Model registry matching MAPPERS
+MODELS = {
+    "daily_activity": DailyActivity,
+    "daily_sleep": DailySleep,
+    "daily_readiness": DailyReadiness,
+    "daily_spo2": DailySpo2,
+    "daily_stress": DailyStress,
+}